@@ -4,39 +4,84 @@ UK Sponsor Lookup - Web API v2
 Restful API with deduplication and external links.
 """
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from flask_orjson import OrjsonProvider
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from whitenoise import WhiteNoise
 from sponsor_lookup import FastSponsorLookup
 import os
 import sys
 import re
-import json
+import functools
+import tempfile
+import orjson
+import redis
+import xxhash
+from types import MappingProxyType
+from typing import Optional
 from urllib.parse import quote
 from datetime import datetime
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+
+def _json_default(obj):
+    """Serialize types orjson doesn't handle natively."""
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+app.json.default = _json_default
+
+# Serve the frontend (public/index.html at /) ahead of Flask's routing;
+# resolved against the app, not the CWD gunicorn happens to start in
+app.wsgi_app = WhiteNoise(app.wsgi_app, root=os.path.join(app.root_path, 'public'), index_file=True)
 CORS(app)
 
 # Rate limiting - 100 requests per hour per IP
+# Point RATELIMIT_REDIS at a Redis instance (e.g. redis://localhost:6379/0) so
+# every gunicorn worker shares one set of counters; in-memory is per-process.
 limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=["100 per hour"],
-    storage_uri="memory://"
+    storage_uri=os.environ.get('RATELIMIT_REDIS', 'memory://'),
+    strategy="moving-window"
 )
 
 CSV_PATH = os.environ.get('SPONSOR_CSV', 'uk_sponsors.csv')
 STATS_FILE = 'stats.json'
-lookup = None
+REDIS_URL = os.environ.get('REDIS_URL')
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Load once at import so every worker is ready before its first request
+lookup = FastSponsorLookup(CSV_PATH)
+# Changes whenever the sponsor CSV is replaced; part of every result ETag
+CSV_VERSION = xxhash.xxh3_64_hexdigest(str(os.path.getmtime(CSV_PATH)))
+# Warm the /api/stats aggregates while we're already paying for load
+lookup.stats_aggregates()
 
 def load_stats():
     """Load search statistics."""
+    if redis_client is not None:
+        try:
+            total, last_updated = redis_client.mget('sponsor:searches', 'sponsor:last_updated')
+        except redis.RedisError as e:
+            # Stats are best-effort; a Redis outage mustn't fail the request
+            print(f"Could not read stats from Redis: {e}", file=sys.stderr)
+            return {'total_searches': 0, 'last_updated': None}
+        return {
+            'total_searches': int(total or 0),
+            'last_updated': last_updated.decode() if last_updated else None
+        }
     if os.path.exists(STATS_FILE):
         try:
-            with open(STATS_FILE, 'r') as f:
-                return json.load(f)
+            with open(STATS_FILE, 'rb') as f:
+                return orjson.loads(f.read())
         except:
             pass
     return {'total_searches': 0, 'last_updated': datetime.now().isoformat()}
@@ -44,24 +89,69 @@ def load_stats():
 def save_stats(stats):
     """Save search statistics."""
     stats['last_updated'] = datetime.now().isoformat()
-    with open(STATS_FILE, 'w') as f:
-        json.dump(stats, f)
+    # Write then rename so a crash mid-write can't leave a truncated file;
+    # each writer gets its own temp file so concurrent saves can't collide
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(STATS_FILE)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(stats))
+        # mkstemp creates files 0600; keep stats.json at the usual 0644
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, STATS_FILE)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
 
 def increment_search():
     """Increment search counter."""
+    if redis_client is not None:
+        # Atomic across workers; one round trip for both keys
+        try:
+            pipe = redis_client.pipeline()
+            pipe.incr('sponsor:searches')
+            pipe.set('sponsor:last_updated', datetime.now().isoformat())
+            total, _ = pipe.execute()
+        except redis.RedisError as e:
+            # The counter is best-effort; never fail a search over it
+            print(f"Could not update stats in Redis: {e}", file=sys.stderr)
+            return 0
+        return total
+    
     stats = load_stats()
     stats['total_searches'] += 1
-    save_stats(stats)
+    try:
+        save_stats(stats)
+    except OSError as e:
+        # The counter is best-effort; never fail a search over it
+        print(f"Could not save stats: {e}", file=sys.stderr)
     return stats['total_searches']
 
-@app.before_request
-def init_lookup():
-    global lookup
-    if lookup is None:
-        lookup = FastSponsorLookup(CSV_PATH)
+# Static URL prefixes for generate_external_links; each link is just
+# prefix + encoded field (+ short suffix).
+_LINKEDIN_SEARCH_URL = "https://www.linkedin.com/search/results/companies/?keywords="
+_LINKEDIN_JOBS_URL = "https://www.linkedin.com/jobs/search?keywords="
+_LINKEDIN_UK_SUFFIX = "&location=United%20Kingdom"
+_INDEED_JOBS_URL = "https://uk.indeed.com/jobs?q="
+_INDEED_COMPANY_URL = "https://uk.indeed.com/cmp/"
+_GLASSDOOR_OVERVIEW_URL = "https://www.glassdoor.co.uk/Overview/Working-at-"
+_GLASSDOOR_JOBS_URL = "https://www.glassdoor.co.uk/Search/results.htm?keyword="
+_COMPANIES_HOUSE_URL = "https://find-and-update.company-information.service.gov.uk/search?q="
+_GOOGLE_URL = "https://www.google.com/search?q="
+_GOOGLE_MAPS_URL = "https://www.google.com/maps/search/"
+_REED_URL = "https://www.reed.co.uk/jobs/"
+_TOTALJOBS_URL = "https://www.totaljobs.com/jobs/"
+_CWJOBS_URL = "https://www.cwjobs.co.uk/jobs/"
 
-def generate_external_links(company_name: str, city: str = None, county: str = None) -> dict:
-    """Generate UK-specific external profile links for a company using name + location."""
+@functools.lru_cache(maxsize=8192)
+def generate_external_links(company_name: str, city: Optional[str] = None, county: Optional[str] = None) -> MappingProxyType:
+    """Generate UK-specific external profile links for a company using name + location.
+    
+    Results are cached per (name, city, county) and returned read-only, since
+    the same mapping is shared between every response that includes it.
+    """
     
     # Build location-aware search queries
     location_parts = []
@@ -72,68 +162,88 @@ def generate_external_links(company_name: str, city: str = None, county: str = N
     
     location_str = ", ".join(location_parts)
     
-    # Company name query
+    # Percent-encode each field once
     company_query = quote(company_name)
-    
-    # Company + Location query (for more specific searches)
     if location_str:
-        company_location_query = quote(f"{company_name} {location_str} UK")
+        maps_query = quote(f"{company_name} {location_str}")
+        google_query = maps_query + "%20UK"
         location_query = quote(location_str)
     else:
-        company_location_query = company_query
+        maps_query = google_query = company_query
         location_query = "United+Kingdom"
     
     # UK-specific search URLs
-    return {
+    return MappingProxyType({
         # LinkedIn - UK focused
-        'linkedin_search': f"https://www.linkedin.com/search/results/companies/?keywords={company_query}&location=United%20Kingdom",
-        'linkedin_jobs': f"https://www.linkedin.com/jobs/search?keywords={company_query}&location=United%20Kingdom",
+        'linkedin_search': _LINKEDIN_SEARCH_URL + company_query + _LINKEDIN_UK_SUFFIX,
+        'linkedin_jobs': _LINKEDIN_JOBS_URL + company_query + _LINKEDIN_UK_SUFFIX,
         
         # Indeed - UK specific
-        'indeed_jobs': f"https://uk.indeed.com/jobs?q={company_query}&l={location_query if location_str else 'United+Kingdom'}",
-        'indeed_company': f"https://uk.indeed.com/cmp/{company_query}",
+        'indeed_jobs': _INDEED_JOBS_URL + company_query + "&l=" + location_query,
+        'indeed_company': _INDEED_COMPANY_URL + company_query,
         
         # Glassdoor - UK specific
-        'glassdoor_overview': f"https://www.glassdoor.co.uk/Overview/Working-at-{company_query}-EI_IE.htm",
-        'glassdoor_jobs': f"https://www.glassdoor.co.uk/Search/results.htm?keyword={company_query}",
+        'glassdoor_overview': _GLASSDOOR_OVERVIEW_URL + company_query + "-EI_IE.htm",
+        'glassdoor_jobs': _GLASSDOOR_JOBS_URL + company_query,
         
         # Companies House - UK official registry
-        'companies_house': f"https://find-and-update.company-information.service.gov.uk/search?q={company_query}",
+        'companies_house': _COMPANIES_HOUSE_URL + company_query,
         
         # Google - UK focused with location
-        'google': f"https://www.google.com/search?q={company_location_query}",
-        'google_maps': f"https://www.google.com/maps/search/{quote(company_name + ' ' + location_str) if location_str else company_query}",
+        'google': _GOOGLE_URL + google_query,
+        'google_maps': _GOOGLE_MAPS_URL + maps_query,
         
         # UK-specific job boards
-        'reed': f"https://www.reed.co.uk/jobs/{company_query}-jobs",
-        'totaljobs': f"https://www.totaljobs.com/jobs/{company_query}",
-        'cwjobs': f"https://www.cwjobs.co.uk/jobs/{company_query}",
+        'reed': _REED_URL + company_query + "-jobs",
+        'totaljobs': _TOTALJOBS_URL + company_query,
+        'cwjobs': _CWJOBS_URL + company_query,
         
         # Information
         'source': 'uk_specific',
         'location_used': location_str or 'United Kingdom'
-    }
+    })
 
-def deduplicate_results(results):
-    """Deduplicate results by company name, keeping the best match."""
+def deduplicate_results(results, limit):
+    """Deduplicate results by company name, keeping the best match.
+    
+    ``results`` must be sorted best first (as ``FastSponsorLookup.search``
+    returns them), so the first hit for a name is its best. Returns up to
+    ``limit`` ``(score, sponsor)`` tuples in that order.
+    """
     seen = {}
     
     for sponsor, score in results:
+        if len(seen) >= limit:
+            break
         name = sponsor['name']
-        if name not in seen or seen[name]['score'] < score:
-            seen[name] = {
-                'sponsor': sponsor,
-                'score': score
-            }
+        if name not in seen:
+            seen[name] = (score, sponsor)
     
-    # Convert back to list format, sorted by score
-    return [(v['sponsor'], v['score']) for v in sorted(seen.values(), key=lambda x: x['score'], reverse=True)]
+    return list(seen.values())
+
+def result_etag(*parts) -> str:
+    """ETag for a response that depends only on `parts` and the loaded CSV."""
+    key = "|".join(str(p) for p in parts) + "|" + CSV_VERSION
+    return xxhash.xxh3_64_hexdigest(key)
+
+def cacheable(response: Response, etag: str) -> Response:
+    """Mark a response as cacheable for 5 minutes; 304 if the client has it."""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
+
+
+def json_response(payload) -> Response:
+    """Encode straight to bytes, skipping jsonify's str round trip."""
+    return Response(orjson.dumps(payload, default=_json_default), mimetype='application/json')
+
 
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({
         'status': 'ok',
-        'sponsors_loaded': len(lookup.sponsors) if lookup else 0
+        'sponsors_loaded': len(lookup)
     })
 
 @app.route('/api/search', methods=['GET'])
@@ -149,15 +259,17 @@ def search():
     # Increment search counter
     total_searches = increment_search()
     
-    results = lookup.search(company, threshold=threshold, max_results=50)
+    etag = result_etag(company, threshold, limit)
+    if request.if_none_match.contains(etag):
+        # Client already has this exact result; skip the search entirely
+        return cacheable(Response(), etag)
     
-    # Deduplicate by company name
-    results = deduplicate_results(results)
+    results = lookup.search(company, threshold=threshold, max_results=50)
     
-    # Limit results
-    results = results[:limit]
+    # Deduplicate by company name and keep the top `limit`
+    results = deduplicate_results(results, limit)
     
-    return jsonify({
+    return cacheable(json_response({
         'query': company,
         'count': len(results),
         'results': [
@@ -171,9 +283,9 @@ def search():
                 'is_confirmed': score >= 0.8,
                 'links': generate_external_links(s['name'], s.get('city'), s.get('county'))
             }
-            for s, score in results
+            for score, s in results
         ]
-    })
+    }), etag)
 
 @app.route('/api/check', methods=['GET'])
 def check():
@@ -183,10 +295,14 @@ def check():
     if not company:
         return jsonify({'error': 'Company name required'}), 400
     
+    etag = result_etag(company, threshold)
+    if request.if_none_match.contains(etag):
+        return cacheable(Response(), etag)
+    
     sponsor = lookup.is_sponsor(company, threshold=threshold)
     
     if sponsor:
-        return jsonify({
+        response = jsonify({
             'is_sponsor': True,
             'company': sponsor['name'],
             'city': sponsor['city'],
@@ -196,10 +312,11 @@ def check():
             'links': generate_external_links(sponsor['name'], sponsor.get('city'), sponsor.get('county'))
         })
     else:
-        return jsonify({
+        response = jsonify({
             'is_sponsor': False,
             'message': 'Company not found in sponsor registry'
         })
+    return cacheable(response, etag)
 
 @app.route('/api/url', methods=['POST'])
 @limiter.limit("20 per minute")  # Stricter limit for URL processing
@@ -232,31 +349,18 @@ def check_url():
 
 @app.route('/api/stats', methods=['GET'])
 def stats():
-    routes = {}
-    ratings = {}
-    
-    for s in lookup.sponsors:
-        route = s['route']
-        routes[route] = routes.get(route, 0) + 1
-        rating = s['rating']
-        ratings[rating] = ratings.get(rating, 0) + 1
-    
+    top_routes, ratings, unique_companies = lookup.stats_aggregates()
     search_stats = load_stats()
     
-    return jsonify({
-        'total_sponsors': len(lookup.sponsors),
-        'unique_companies': len(set(s['name'] for s in lookup.sponsors)),
-        'top_routes': dict(sorted(routes.items(), key=lambda x: -x[1])[:10]),
+    return json_response({
+        'total_sponsors': len(lookup),
+        'unique_companies': unique_companies,
+        'top_routes': top_routes,
         'ratings': ratings,
         'total_searches': search_stats.get('total_searches', 0),
         'stats_last_updated': search_stats.get('last_updated')
     })
 
-@app.route('/', methods=['GET'])
-def index():
-    """Serve the main HTML interface."""
-    return send_from_directory('.', 'index.html')
-
 @app.route('/api', methods=['GET'])
 def api_info():
     """API information endpoint."""
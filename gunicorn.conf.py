@@ -0,0 +1,13 @@
+# Gunicorn settings, picked up automatically from the working directory.
+import gc
+
+# Import api (and load the sponsor CSV) once in the master, then fork
+# workers from it so they share the loaded index copy-on-write instead of
+# each building their own.
+preload_app = True
+
+
+def when_ready(server):
+    # Move the loaded objects out of the GC's tracked generations so
+    # collections in the workers don't touch (and un-share) their pages.
+    gc.freeze()
@@ -14,89 +14,156 @@ import json
 import sqlite3
 import os
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import hashlib
 import time
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+import orjson
+from cachetools import TTLCache
+
+# Shared keep-alive client so consecutive Google queries reuse one connection
+_HTTPX = httpx.Client(http2=True, timeout=10, limits=httpx.Limits(max_keepalive_connections=20))
+atexit.register(_HTTPX.close)
+
 
 class ProfileCache:
     """SQLite-based cache for external profile data."""
     
+    _CREATE_SQL = """
+        CREATE TABLE IF NOT EXISTS profiles (
+            company_name TEXT PRIMARY KEY,
+            data BLOB,
+            cached_at TIMESTAMP,
+            refresh_after TIMESTAMP
+        )
+    """
+    
+    _INSERT_SQL = """
+        INSERT OR REPLACE INTO profiles (company_name, data, cached_at, refresh_after)
+        VALUES (?, ?, ?, ?)
+    """
+    
+    # Profile fields stored together as one orjson blob in the `data` column
+    _DATA_FIELDS = (
+        'linkedin_url', 'linkedin_title', 'indeed_url',
+        'glassdoor_url', 'glassdoor_rating', 'website_url'
+    )
+    
     def __init__(self, db_path: str = "profile_cache.db"):
         self.db_path = db_path
+        # One long-lived connection in autocommit mode; transactions are
+        # opened explicitly where batching matters (see set_many)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # Hot profiles are served from memory without touching SQLite
+        self._mem = TTLCache(maxsize=4096, ttl=300)
+        self._mem_lock = threading.Lock()  # TTLCache isn't thread-safe
         self._init_db()
     
     def _init_db(self):
         """Initialize SQLite cache table."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    company_name TEXT PRIMARY KEY,
-                    linkedin_url TEXT,
-                    linkedin_title TEXT,
-                    indeed_url TEXT,
-                    glassdoor_url TEXT,
-                    glassdoor_rating TEXT,
-                    website_url TEXT,
-                    cached_at TIMESTAMP,
-                    refresh_after TIMESTAMP
-                )
-            """)
-            conn.commit()
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(profiles)")]
+        if columns and 'data' not in columns:
+            self._migrate_to_blob()
+        
+        self.conn.execute(self._CREATE_SQL)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_refresh ON profiles(refresh_after)")
+    
+    def _migrate_to_blob(self):
+        """Convert a cache from the old one-column-per-field schema."""
+        rows = self.conn.execute(
+            "SELECT company_name, " + ", ".join(self._DATA_FIELDS) +
+            ", cached_at, refresh_after FROM profiles"
+        ).fetchall()
+        
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.execute("DROP TABLE profiles")
+            self.conn.execute(self._CREATE_SQL)
+            self.conn.executemany(self._INSERT_SQL, [
+                (row[0], orjson.dumps(dict(zip(self._DATA_FIELDS, row[1:7]))), row[7], row[8])
+                for row in rows
+            ])
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
     
     def get(self, company_name: str) -> Optional[Dict]:
         """Get cached profile if not stale."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT * FROM profiles WHERE company_name = ? AND refresh_after > ?",
-                (company_name, datetime.now())
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    'company_name': row[0],
-                    'linkedin_url': row[1],
-                    'linkedin_title': row[2],
-                    'indeed_url': row[3],
-                    'glassdoor_url': row[4],
-                    'glassdoor_rating': row[5],
-                    'website_url': row[6],
-                    'cached_at': row[7]
-                }
-            return None
+        with self._mem_lock:
+            cached = self._mem.get(company_name)
+        if cached is not None:
+            return cached
+        
+        cursor = self.conn.execute(
+            "SELECT company_name, data, cached_at FROM profiles WHERE company_name = ? AND refresh_after > ?",
+            (company_name, datetime.now())
+        )
+        row = cursor.fetchone()
+        
+        if row:
+            profile = {'company_name': row[0], **orjson.loads(row[1]), 'cached_at': row[2]}
+            with self._mem_lock:
+                self._mem[company_name] = profile
+            return profile
+        return None
+    
+    def _fields(self, data: Dict) -> Dict:
+        """Pick the cached profile fields out of enrichment data."""
+        return {field: data.get(field) for field in self._DATA_FIELDS}
     
     def set(self, company_name: str, data: Dict, ttl_days: int = 30):
         """Cache profile data with TTL."""
         now = datetime.now()
         refresh_after = now + timedelta(days=ttl_days)
+        fields = self._fields(data)
+        self.conn.execute(self._INSERT_SQL, (company_name, orjson.dumps(fields), now, refresh_after))
+        self._remember(company_name, fields, now, refresh_after)
+    
+    def set_many(self, items: List[Tuple[str, Dict]], ttl_days: int = 30):
+        """Cache several profiles in a single transaction."""
+        now = datetime.now()
+        refresh_after = now + timedelta(days=ttl_days)
+        profiles = [(name, self._fields(data)) for name, data in items]
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO profiles 
-                (company_name, linkedin_url, linkedin_title, indeed_url, glassdoor_url, 
-                 glassdoor_rating, website_url, cached_at, refresh_after)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                company_name,
-                data.get('linkedin_url'),
-                data.get('linkedin_title'),
-                data.get('indeed_url'),
-                data.get('glassdoor_url'),
-                data.get('glassdoor_rating'),
-                data.get('website_url'),
-                now,
-                refresh_after
-            ))
-            conn.commit()
+        self.conn.execute("BEGIN")
+        try:
+            self.conn.executemany(self._INSERT_SQL, [
+                (name, orjson.dumps(fields), now, refresh_after) for name, fields in profiles
+            ])
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+        
+        for name, fields in profiles:
+            self._remember(name, fields, now, refresh_after)
+    
+    def _remember(self, company_name: str, fields: Dict, cached_at: datetime, refresh_after: datetime):
+        """Write a freshly stored profile through to the in-memory tier."""
+        with self._mem_lock:
+            if refresh_after > cached_at:
+                # cached_at as str to match what SQLite hands back
+                self._mem[company_name] = {'company_name': company_name, **fields, 'cached_at': str(cached_at)}
+            else:
+                self._mem.pop(company_name, None)
     
     def get_stale_entries(self, limit: int = 100):
         """Get entries needing refresh (for n8n batch job)."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT company_name FROM profiles WHERE refresh_after < ? LIMIT ?",
-                (datetime.now(), limit)
-            )
-            return [row[0] for row in cursor.fetchall()]
+        cursor = self.conn.execute(
+            "SELECT company_name FROM profiles WHERE refresh_after < ? LIMIT ?",
+            (datetime.now(), limit)
+        )
+        return [row[0] for row in cursor.fetchall()]
+    
+    def close(self):
+        """Close the underlying SQLite connection."""
+        self.conn.close()
 
 
 class ProfileEnricher:
@@ -119,14 +186,10 @@ class ProfileEnricher:
             return {**cached, 'source': 'cache'}
         
         # 2. Try Google Custom Search (if configured)
-        if self.google_api_key and self.google_cx:
-            try:
-                data = self._fetch_from_google(company_name)
-                if data:
-                    self.cache.set(company_name, data)
-                    return {**data, 'source': 'google_api'}
-            except Exception as e:
-                print(f"Google API error for {company_name}: {e}")
+        data = self.fetch(company_name)
+        if data:
+            self.cache.set(company_name, data)
+            return {**data, 'source': 'google_api'}
         
         # 3. Fallback to algorithmic links
         return {
@@ -138,14 +201,25 @@ class ProfileEnricher:
             'source': 'algorithmic'
         }
     
+    def fetch(self, company_name: str) -> Optional[Dict]:
+        """Look a company up via Google without touching the cache.
+        
+        Returns None if Google isn't configured or the lookup fails.
+        """
+        if not (self.google_api_key and self.google_cx):
+            return None
+        try:
+            return self._fetch_from_google(company_name)
+        except Exception as e:
+            print(f"Google API error for {company_name}: {e}")
+            return None
+    
     def _fetch_from_google(self, company_name: str) -> Optional[Dict]:
         """
         Use Google Custom Search API to find actual profiles.
         Free tier: 100 queries/day
         Cost: $5 per 1000 queries after that
         """
-        import requests
-        
         results = {}
         
         # Search for LinkedIn
@@ -170,8 +244,6 @@ class ProfileEnricher:
     def _google_search(self, query: str, site: Optional[str] = None, 
                        exclude: Optional[list] = None) -> Optional[Dict]:
         """Execute Google Custom Search."""
-        import requests
-        
         if site:
             query = f"site:{site} {query}"
         
@@ -187,7 +259,7 @@ class ProfileEnricher:
             'num': 1
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = _HTTPX.get(url, params=params)
         data = response.json()
         
         if 'items' in data and len(data['items']) > 0:
@@ -212,29 +284,44 @@ class ProfileEnricher:
 
 
 # Batch refresh script for n8n
-def batch_refresh_stale(limit: int = 50):
+def batch_refresh_stale(limit: int = 50, concurrency: int = 10):
     """
     Refresh stale entries. Run this via n8n monthly.
     Only processes companies that need updates.
+    
+    Companies are refreshed ``concurrency`` at a time; each worker pauses
+    briefly between companies to stay under Google's per-second quota.
     """
     enricher = ProfileEnricher(
         google_api_key=os.getenv('GOOGLE_API_KEY'),
         google_cx=os.getenv('GOOGLE_CX')
     )
     
-    cache = ProfileCache()
-    stale = cache.get_stale_entries(limit=limit)
+    # Reuse the enricher's cache so the whole run shares one connection
+    stale = enricher.cache.get_stale_entries(limit=limit)
     
-    refreshed = 0
-    for company in stale:
-        try:
-            enricher.enrich(company)
-            refreshed += 1
-            time.sleep(1)  # Rate limiting
-        except Exception as e:
-            print(f"Failed to refresh {company}: {e}")
+    def refresh(company: str) -> Optional[Dict]:
+        data = enricher.fetch(company)
+        time.sleep(0.1)  # Rate limiting
+        return data
+    
+    # Fetch concurrently, then write everything in one transaction
+    fetched = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(refresh, company): company for company in stale}
+        for future in as_completed(futures):
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Failed to refresh {futures[future]}: {e}")
+                continue
+            if data:
+                fetched.append((futures[future], data))
+    
+    if fetched:
+        enricher.cache.set_many(fetched)
     
-    return {'refreshed': refreshed, 'total_stale': len(stale)}
+    return {'refreshed': len(fetched), 'total_stale': len(stale)}
 
 
 if __name__ == '__main__':
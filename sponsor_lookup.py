@@ -6,6 +6,7 @@ Check if a company is a registered UK visa sponsor.
 Usage:
     python sponsor_lookup.py --company "Company Name"
     python sponsor_lookup.py --url "https://job-board.com/job/123"
+    python sponsor_lookup.py --batch urls.txt
     python sponsor_lookup.py --interactive
 """
 
@@ -15,150 +16,461 @@ import re
 import os
 import sys
 import json
+import pickle
+import tempfile
+import atexit
+import threading
+import time
+import functools
+from collections import Counter
+from operator import itemgetter
+from itertools import chain, repeat
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Set
-from urllib.request import urlopen, Request
-from urllib.error import URLError, HTTPError
 from urllib.parse import urlparse
+import httpx
 
 # Fix Windows encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Precompiled patterns (hot paths: _normalize runs once per CSV row)
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+
+# Words dropped from company names pulled out of URLs (compared lowercased)
+_NOISE_SET = frozenset({
+    'jobs', 'careers', 'ltd', 'limited', 'inc', 'corp', 'corporation', 'plc', 'llc'
+})
+
+# Company markup on job pages: Indeed's company attribute and JSON-LD,
+# found in one scan
+_PAGE_COMPANY_RE = re.compile(
+    r'data-company-name="(?P<indeed>[^"]+)"'
+    r'|<script type="application/ld\+json">(?P<jsonld>[^<]+)</script>'
+)
+# That markup sits near the top of the page, so only this much of the
+# (decompressed) body is read
+_PAGE_HEAD_BYTES = 65536
+
+# Shared keep-alive client so repeat fetches from a job board skip the
+# TCP/TLS handshake; HTTP/2 also lets a head-only read cancel just its
+# stream instead of dropping the connection
+_HTTPX = httpx.Client(
+    http2=True, timeout=10, follow_redirects=True,
+    headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
+    limits=httpx.Limits(max_keepalive_connections=8)
+)
+atexit.register(_HTTPX.close)
+
+
+class _HostRateLimiter:
+    """Spaces out requests to the same host across threads."""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def wait(self, host: str):
+        """Block until the caller's turn to request ``host``."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        time.sleep(slot - now)
+
+
+def _build_domain_trie(domains: Dict[str, str]) -> Dict:
+    """Nest domains by reversed labels (jobs.hsbc.co.uk -> uk/co/hsbc/jobs).
+    
+    Each domain's value is stored under the None key of its last node.
+    """
+    trie: Dict = {}
+    for domain, value in domains.items():
+        node = trie
+        for label in reversed(domain.split('.')):
+            node = node.setdefault(label, {})
+        node[None] = value
+    return trie
+
+# Company pages on job boards, keyed by the netloc fragment that selects
+# them so each URL runs at most one pattern
+_URL_PATTERNS = {
+    # LinkedIn company pages - most reliable
+    'linkedin.com': re.compile(r'linkedin\.com/company/([^/]+)/?(?:jobs|about)?$'),
+    # Indeed company pages
+    'indeed.': re.compile(r'indeed\.(?:com|co\.uk)/cmp/([^/]+)'),
+    # Glassdoor company pages
+    'glassdoor.': re.compile(r'glassdoor\.(?:com|co\.uk)/overview/working-at-([^-]+)-'),
+    # Reed
+    'reed.co.uk': re.compile(r'reed\.co\.uk/company/([^/]+)'),
+    # Totaljobs
+    'totaljobs.com': re.compile(r'totaljobs\.com/company/([^/]+)'),
+}
+_SUBDOMAIN_RE = re.compile(r'^([^.]+)\.(?:careers?|jobs|apply|workday)\.')
+
 
 class FastSponsorLookup:
     """Optimized UK Sponsor Lookup with fast indexing."""
     
+    # Columns read from the Home Office register, in unpacking order
+    CSV_COLUMNS = ('Organisation Name', 'Town/City', 'County', 'Type & Rating', 'Route')
+    
+    # Built structures saved to <csv_path>.idx so unchanged CSVs skip parsing;
+    # bump INDEX_VERSION whenever their layout changes
+    INDEX_VERSION = 3
+    INDEX_ATTRS = (
+        'names', 'cities', 'counties', 'ratings', 'routes',
+        'norm_names', 'name_rows', 'name_to_id', 'word_index',
+        '_token_ids', '_name_tokens'
+    )
+    
     def __init__(self, csv_path: str = "uk_sponsors.csv"):
         self.csv_path = csv_path
-        self.sponsors: List[Dict] = []
-        self.name_to_sponsors: Dict[str, List[Dict]] = {}
-        self.word_index: Dict[str, Set[str]] = {}
+        # Sponsor rows stored column-wise; a row id indexes all five lists
+        self.names: List[str] = []
+        self.cities: List[str] = []
+        self.counties: List[str] = []
+        self.ratings: List[str] = []
+        self.routes: List[str] = []
+        # Distinct normalized names; a name id indexes both lists
+        self.norm_names: List[str] = []
+        self.name_rows: List[Tuple[int, ...]] = []
+        self.name_to_id: Dict[str, int] = {}
+        # Word -> ids of the normalized names containing it, ascending
+        self.word_index: Dict[str, Tuple[int, ...]] = {}
+        # Every distinct word gets a token id; each name keeps its distinct
+        # token ids so similarity is int set arithmetic, not re-tokenizing
+        self._token_ids: Dict[str, int] = {}
+        self._name_tokens: List[Tuple[int, ...]] = []
+        # All normalized names joined by '\n', with each name's start offset,
+        # so substring search is one C-level str.find scan
+        self._names_blob = ''
+        self._name_starts: List[int] = []
+        self._max_name_len = 0
+        # Token count -> ids of names with that many distinct words
+        self._names_by_size: Dict[int, Set[int]] = {}
+        self._stats: Optional[Tuple[Dict[str, int], Dict[str, int], int]] = None
+        # Per-instance so the cache doesn't keep other lookups alive
+        self._search_cached = functools.lru_cache(maxsize=512)(self._search_rows)
         self._load_data()
     
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def _row(self, row_id: int) -> Dict:
+        """Build the sponsor dict for a row id."""
+        return {
+            'name': self.names[row_id],
+            'city': self.cities[row_id],
+            'county': self.counties[row_id],
+            'rating': self.ratings[row_id],
+            'route': self.routes[row_id]
+        }
+    
     def _normalize(self, text: str) -> str:
         """Normalize text for comparison."""
-        text = re.sub(r'[^\w\s]', '', text.lower())
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _NON_WORD_RE.sub('', text.lower())
+        text = _WS_RE.sub(' ', text).strip()
         return text
     
     def _load_data(self):
-        """Load and index sponsor data from CSV."""
+        """Load and index sponsor data, reusing the saved index if current."""
         if not os.path.exists(self.csv_path):
             raise FileNotFoundError(f"Sponsor CSV not found: {self.csv_path}")
         
         print(f"Loading sponsor data...", file=sys.stderr)
         
-        with open(self.csv_path, 'r', encoding='utf-8', errors='ignore') as f:
-            reader = csv.DictReader(f)
+        st = os.stat(self.csv_path)
+        key = (self.INDEX_VERSION, st.st_mtime_ns, st.st_size)
+        if not self._load_index(key):
+            self._parse_csv()
+            self._save_index(key)
+        
+        self._build_substring_index()
+        self._build_size_index()
+        print(f"Loaded {len(self.names)} sponsor records", file=sys.stderr)
+    
+    def _load_index(self, key: Tuple[int, int, int]) -> bool:
+        """Restore the saved index if it was built from this CSV."""
+        try:
+            with open(self.csv_path + '.idx', 'rb') as f:
+                saved = pickle.load(f)
+            if saved['key'] != key:
+                return False
+        except Exception:
+            return False  # Missing, unreadable or from an older layout
+        for attr in self.INDEX_ATTRS:
+            setattr(self, attr, saved[attr])
+        self._share_ids()
+        return True
+    
+    def _share_ids(self):
+        """Make every reference to an id use one shared int object.
+        
+        Pickle doesn't memoize ints, so a loaded index otherwise holds a
+        separate int per reference (e.g. one per name containing "ltd").
+        """
+        ids = list(range(max(len(self._token_ids), len(self.norm_names))))
+        get = ids.__getitem__
+        self.name_to_id = dict(zip(self.name_to_id, map(get, self.name_to_id.values())))
+        self._token_ids = dict(zip(self._token_ids, map(get, self._token_ids.values())))
+        self.word_index = {word: tuple(map(get, name_ids)) for word, name_ids in self.word_index.items()}
+        self._name_tokens = [tuple(map(get, tokens)) for tokens in self._name_tokens]
+    
+    def _save_index(self, key: Tuple[int, int, int]):
+        """Save the built index next to the CSV, replacing it atomically."""
+        saved = {'key': key}
+        for attr in self.INDEX_ATTRS:
+            saved[attr] = getattr(self, attr)
+        idx_path = self.csv_path + '.idx'
+        try:
+            # A private temp file per writer, so a CLI run next to the server
+            # (or workers starting together) can't interleave into one file
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(os.path.abspath(idx_path)),
+                prefix=os.path.basename(idx_path) + '.', suffix='.tmp', delete=False
+            ) as f:
+                tmp = f.name
+                try:
+                    pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+                except BaseException:
+                    f.close()
+                    os.unlink(tmp)
+                    raise
+            try:
+                os.replace(tmp, idx_path)
+            except OSError:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            # Read-only deploys just rebuild on every start
+            print(f"Could not save sponsor index: {e}", file=sys.stderr)
+    
+    def _parse_csv(self):
+        """Parse the sponsor CSV and build the indexes."""
+        name_rows: List[List[int]] = []
+        word_index: Dict[str, List[int]] = {}
+        
+        with open(self.csv_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            missing = [c for c in self.CSV_COLUMNS if c not in header]
+            if missing:
+                raise ValueError(f"Sponsor CSV missing columns: {', '.join(missing)}")
+            
+            # Plain rows + one itemgetter avoid building a dict per CSV row
+            pick = itemgetter(*(header.index(c) for c in self.CSV_COLUMNS))
+            width = len(header)
+            
             for row in reader:
-                org_name = row.get('Organisation Name', '').strip().strip('"')
+                if len(row) < width:
+                    continue
+                org_name, city, county, rating, route = [v.strip().strip('"') for v in pick(row)]
                 if not org_name:
                     continue
-                    
-                sponsor = {
-                    'name': org_name,
-                    'city': row.get('Town/City', '').strip().strip('"'),
-                    'county': row.get('County', '').strip().strip('"'),
-                    'rating': row.get('Type & Rating', '').strip().strip('"'),
-                    'route': row.get('Route', '').strip().strip('"')
-                }
-                self.sponsors.append(sponsor)
+                
+                row_id = len(self.names)
+                self.names.append(org_name)
+                # Few distinct values per column; interning stores each once
+                self.cities.append(sys.intern(city))
+                self.counties.append(sys.intern(county))
+                self.ratings.append(sys.intern(rating))
+                self.routes.append(sys.intern(route))
                 
                 # Index by normalized full name
                 normalized = self._normalize(org_name)
-                if normalized not in self.name_to_sponsors:
-                    self.name_to_sponsors[normalized] = []
-                self.name_to_sponsors[normalized].append(sponsor)
+                name_id = self.name_to_id.get(normalized)
+                if name_id is not None:
+                    name_rows[name_id].append(row_id)
+                    continue
+                name_id = len(self.norm_names)
+                self.name_to_id[normalized] = name_id
+                self.norm_names.append(normalized)
+                name_rows.append([row_id])
                 
                 # Index individual words
-                words = normalized.split()
+                words = set(normalized.split())
+                token_ids = self._token_ids
+                self._name_tokens.append(tuple(token_ids.setdefault(w, len(token_ids)) for w in words))
                 for word in words:
                     if len(word) > 2:  # Only index words longer than 2 chars
-                        if word not in self.word_index:
-                            self.word_index[word] = set()
-                        self.word_index[word].add(normalized)
+                        word_index.setdefault(word, []).append(name_id)
         
-        print(f"Loaded {len(self.sponsors)} sponsor records", file=sys.stderr)
+        # Most names have one row and most words a handful of names; tuples
+        # hold those far more compactly than lists or sets
+        self.name_rows = [tuple(rows) for rows in name_rows]
+        self.word_index = {word: tuple(name_ids) for word, name_ids in word_index.items()}
     
-    def _simple_similarity(self, a: str, b: str) -> float:
-        """Simple but fast similarity calculation."""
-        a_words = set(self._normalize(a).split())
-        b_words = set(self._normalize(b).split())
-        
-        if not a_words or not b_words:
-            return 0.0
-        
-        intersection = len(a_words & b_words)
-        union = len(a_words | b_words)
+    def _build_substring_index(self):
+        """Join normalized names into one searchable string."""
+        offset = 0
+        self._name_starts = []
+        for name in self.norm_names:
+            self._name_starts.append(offset)
+            offset += len(name) + 1
+        self._names_blob = '\n'.join(self.norm_names)
+        self._max_name_len = max(map(len, self.norm_names), default=0)
+    
+    def _build_size_index(self):
+        """Bucket name ids by how many distinct words each name has."""
+        self._names_by_size = {}
+        # name_to_id's values are the shared id objects, in id order
+        for name_id, tokens in zip(self.name_to_id.values(), self._name_tokens):
+            self._names_by_size.setdefault(len(tokens), set()).add(name_id)
+    
+    def _names_containing(self, text: str) -> List[int]:
+        """Ids of normalized names that contain `text`."""
+        # Normalized text never contains '\n', so a match can't span names
+        blob, starts = self._names_blob, self._name_starts
+        found = []
+        pos = blob.find(text)
+        while pos != -1:
+            name_id = bisect_right(starts, pos) - 1
+            found.append(name_id)
+            if name_id + 1 >= len(starts):
+                break
+            # Resume at the next name; one hit per name is enough
+            pos = blob.find(text, starts[name_id + 1])
+        return found
+    
+    def _names_within(self, text: str) -> List[int]:
+        """Ids of normalized names that occur inside `text`."""
+        # Look every substring up directly; names longer than the longest
+        # sponsor name can't match, which bounds the work for long queries
+        found = set()
+        n = len(text)
+        for i in range(n):
+            for j in range(i + 1, min(n, i + self._max_name_len) + 1):
+                name_id = self.name_to_id.get(text[i:j])
+                if name_id is not None:
+                    found.add(name_id)
+        return sorted(found)
+    
+    def _token_similarities(self, query_ids: Set[int], query_len: int, name_ids: List[int]) -> List[float]:
+        """Jaccard similarity between the query's words and each name's words.
         
-        return intersection / union if union > 0 else 0.0
+        ``query_ids`` holds the token ids of query words that occur in the
+        corpus; ``query_len`` counts all distinct query words, since words
+        unknown to the corpus still belong to the union. Names are scored as
+        a batch so the set work runs through map() rather than a Python call
+        per name.
+        """
+        if not query_len:
+            return [0.0] * len(name_ids)
+        name_tokens = list(map(self._name_tokens.__getitem__, name_ids))
+        intersections = map(len, map(query_ids.intersection, name_tokens))
+        return [
+            inter / (query_len + size - inter)
+            for inter, size in zip(intersections, map(len, name_tokens))
+        ]
     
     def search(self, query: str, threshold: float = 0.5, max_results: int = 10) -> List[Tuple[Dict, float]]:
         """Fast search using word index with improved fuzzy matching."""
         query_norm = self._normalize(query)
-        query_words = [w for w in query_norm.split() if len(w) > 2]
-        results = []
-        seen = set()
+        rows = self._search_cached(query_norm, threshold, max_results)
+        return [(self._row(row_id), score) for row_id, score in rows]
+    
+    def _search_rows(self, query_norm: str, threshold: float, max_results: int) -> Tuple[Tuple[int, float], ...]:
+        """Search for a normalized query, returning (row id, score) pairs.
+        
+        Cached per (query, threshold, max_results) by search(); returns
+        row ids rather than dicts so cached results can't be mutated.
+        """
+        # Split once: the distinct words drive both the index lookup and
+        # the similarity scoring
+        query_word_set = set(query_norm.split())
+        query_words = [w for w in query_word_set if len(w) > 2]
+        hits: List[Tuple[int, float]] = []  # (name id, score)
+        seen: Set[int] = set()
         
         # 1. Check for exact match
-        if query_norm in self.name_to_sponsors:
-            for sponsor in self.name_to_sponsors[query_norm]:
-                key = sponsor['name']
-                if key not in seen:
-                    results.append((sponsor, 1.0))
-                    seen.add(key)
+        name_id = self.name_to_id.get(query_norm)
+        if name_id is not None:
+            hits.append((name_id, 1.0))
+            seen.add(name_id)
         
         # 2. Check for substring matches (e.g., "Barclays" in "Barclays Bank PLC")
-        for name, sponsors in self.name_to_sponsors.items():
-            if name in seen:
-                continue
-            # Query is substring of company name
-            if query_norm in name:
-                score = 0.9  # High confidence for substring match
-                for sponsor in sponsors:
-                    results.append((sponsor, score))
-                seen.add(name)
-            # Company name is substring of query (e.g., "Limited" in query)
-            elif len(query_norm) > 5 and name in query_norm:
-                score = 0.85
-                for sponsor in sponsors:
-                    results.append((sponsor, score))
-                seen.add(name)
+        # Query is substring of company name - high confidence
+        substring_scores = {name_id: 0.9 for name_id in self._names_containing(query_norm)}
+        # Company name is substring of query (e.g., "Limited" in query)
+        if len(query_norm) > 5:
+            for name_id in self._names_within(query_norm):
+                substring_scores.setdefault(name_id, 0.85)
+        for name_id in sorted(substring_scores):
+            if name_id not in seen:
+                hits.append((name_id, substring_scores[name_id]))
+                seen.add(name_id)
         
         # 3. Word-based matching (fast pre-filter)
-        candidate_names = set()
+        candidate_ids: Set[int] = set()
         for word in query_words:
             if word in self.word_index:
-                candidate_names.update(self.word_index[word])
+                candidate_ids.update(self.word_index[word])
         
         # 4. Score candidates with improved algorithm
-        for name in candidate_names:
-            if name in seen:
-                continue
-            score = self._simple_similarity(query_norm, name)
-            
-            # Boost score for partial matches
-            query_tokens = set(query_norm.split())
-            name_tokens = set(name.split())
-            
-            # If any query word starts a company name word, boost
-            for qt in query_tokens:
-                for nt in name_tokens:
-                    if nt.startswith(qt) or qt.startswith(nt):
-                        score = max(score, 0.7)
-                    # Handle abbreviations (e.g., "HSBC" matching "HSBC Bank")
-                    if len(qt) >= 3 and qt in nt:
-                        score = max(score, 0.75)
-            
-            if score >= threshold:
-                for sponsor in self.name_to_sponsors[name]:
-                    results.append((sponsor, score))
-                seen.add(name)
+        query_ids = {self._token_ids[w] for w in query_word_set if w in self._token_ids}
+        query_len = len(query_word_set)
+        candidate_ids -= seen
+        
+        # Boost score for partial matches. Candidates come from the word
+        # index, so each shares a whole 3+ char word with the query; that
+        # always earns the top partial-match boost (a query word of 3+
+        # chars inside a name word, e.g. "HSBC" in "HSBC Bank"), which
+        # outranks the 0.7 prefix boost.
+        boost = 0.75
+        
+        # Jaccard similarity can't exceed min/max of the two word counts, so
+        # only names of a similar size can score above the boost (or reach a
+        # higher threshold); only those are scored
+        near_ids: Set[int] = set()
+        for size in range(1, int(query_len / boost) + 2):
+            best = min(size, query_len) / max(size, query_len)
+            if best > boost and best >= threshold and size in self._names_by_size:
+                near_ids |= candidate_ids & self._names_by_size[size]
+        
+        # Id order keeps equal scores in CSV order, however the sets were built
+        name_ids = sorted(near_ids)
+        scores = self._token_similarities(query_ids, query_len, name_ids)
+        boosted = [
+            (name_id, score) for name_id, score in zip(name_ids, scores)
+            if score > boost and score >= threshold
+        ]
+        hits.extend(boosted)
+        
+        # Every other candidate scores exactly the boost, below all the hits
+        # above, so those skip the sort and follow in id order
+        floor_ids: List[int] = []
+        if boost >= threshold:
+            candidate_ids.difference_update(name_id for name_id, _ in boosted)
+            floor_ids = sorted(candidate_ids)
+        
+        # Sort by score, then expand names to sponsor rows up to max_results
+        hits.sort(key=lambda x: x[1], reverse=True)
+        results = []
+        for name_id, score in chain(hits, zip(floor_ids, repeat(boost))):
+            for row_id in self.name_rows[name_id]:
+                if len(results) >= max_results:
+                    return tuple(results)
+                results.append((row_id, score))
+        return tuple(results)
+    
+    def stats_aggregates(self) -> Tuple[Dict[str, int], Dict[str, int], int]:
+        """Return (top 10 routes, ratings, unique company count).
         
-        # Sort by score
-        results.sort(key=lambda x: x[1], reverse=True)
-        return results[:max_results]
+        Sponsor data is read-only after load, so this is computed on first
+        use and cached.
+        """
+        if self._stats is None:
+            self._stats = (
+                dict(Counter(self.routes).most_common(10)),
+                dict(Counter(self.ratings)),
+                len(set(self.names))
+            )
+        return self._stats
     
     def is_sponsor(self, company_name: str, threshold: float = 0.8) -> Optional[Dict]:
         """Check if a specific company is a sponsor."""
@@ -167,52 +479,54 @@ class FastSponsorLookup:
             return results[0][0]
         return None
     
-    def _fetch_page_title(self, url: str) -> Optional[str]:
-        """Try to fetch page title/company from job listing URL."""
+    def _fetch_page_company(self, url: str) -> Optional[str]:
+        """Fetch a job listing and read the company from its markup.
+        
+        Only explicit company markup is trusted (Indeed's data-company-name
+        or JSON-LD hiringOrganization); page titles are too often the job
+        title to be worth guessing from.
+        """
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            req = Request(url, headers=headers, timeout=10)
-            with urlopen(req, timeout=10) as response:
-                html = response.read().decode('utf-8', errors='ignore')
-                
-                # Try to extract company from meta tags or JSON-LD
-                # Indeed pattern: data-company-name or JSON-LD
-                indeed_match = re.search(r'data-company-name="([^"]+)"', html)
-                if indeed_match:
-                    return indeed_match.group(1)
-                
-                # JSON-LD structured data
-                jsonld_match = re.search(r'<script type="application/ld\+json">([^<]+)</script>', html)
-                if jsonld_match:
-                    try:
-                        data = json.loads(jsonld_match.group(1))
-                        if isinstance(data, dict):
-                            if 'hiringOrganization' in data:
-                                org = data['hiringOrganization']
-                                if isinstance(org, dict):
-                                    return org.get('name')
-                            if 'name' in data and 'job' in url.lower():
-                                return data.get('name')
-                    except json.JSONDecodeError:
-                        pass
-                
-                # Title tag fallback
-                title_match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
-                if title_match:
-                    title = title_match.group(1)
-                    # Remove common suffixes
-                    title = re.sub(r' - (Indeed|LinkedIn|Glassdoor|Jobs).*$', '', title, flags=re.IGNORECASE)
-                    title = re.sub(r' \|.*$', '', title)
-                    if ' at ' in title.lower():
-                        parts = title.split(' at ')
-                        if len(parts) >= 2:
-                            return parts[-1].strip()
-                    return title.strip()
-        except (URLError, HTTPError, Exception):
-            pass
+            with _HTTPX.stream('GET', url) as response:
+                if response.is_error:
+                    return None
+                html = self._read_page_head(response)
+        except Exception:
+            return None
+        
+        # One scan: Indeed's attribute wins outright, otherwise the first
+        # JSON-LD block is checked for the hiring organization
+        jsonld = None
+        for match in _PAGE_COMPANY_RE.finditer(html):
+            if match.lastgroup == 'indeed':
+                return match.group('indeed')
+            if jsonld is None:
+                jsonld = match.group('jsonld')
+        
+        if jsonld is None:
+            return None
+        try:
+            data = json.loads(jsonld)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(data, dict):
+            org = data.get('hiringOrganization')
+            if isinstance(org, dict):
+                return org.get('name')
         return None
+    
+    def _read_page_head(self, response: httpx.Response) -> str:
+        """Read and decode the first _PAGE_HEAD_BYTES of a page body.
+        
+        httpx inflates gzip as it streams, so reading stops once enough
+        HTML has been decoded and the rest is never downloaded.
+        """
+        html = b''
+        for chunk in response.iter_bytes():
+            html += chunk
+            if len(html) >= _PAGE_HEAD_BYTES:
+                break
+        return html[:_PAGE_HEAD_BYTES].decode('utf-8', errors='ignore')
 
     # Known company domains for quick lookup
     KNOWN_COMPANY_DOMAINS = {
@@ -226,6 +540,24 @@ class FastSponsorLookup:
         'jobs.tesco.com': 'Tesco',
         'careers.sainsburys.co.uk': 'Sainsburys',
     }
+    _KNOWN_DOMAIN_TRIE = _build_domain_trie(KNOWN_COMPANY_DOMAINS)
+    
+    def _known_company(self, host: str) -> Optional[str]:
+        """Company for a known careers host or any subdomain of one."""
+        host = host.rstrip('.')
+        company = self.KNOWN_COMPANY_DOMAINS.get(host)
+        if company:
+            return company
+        
+        # Walk the host's labels from the TLD down; the deepest known
+        # domain wins, so uk.careers.google.com still maps to Google
+        node = self._KNOWN_DOMAIN_TRIE
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            company = node.get(None, company)
+        return company
     
     def extract_company_from_url(self, url: str) -> Optional[str]:
         """Extract company name from job posting URL.
@@ -238,56 +570,59 @@ class FastSponsorLookup:
         domain = parsed_url.netloc.lower()
         
         # Check known domains first
-        for known_domain, company in self.KNOWN_COMPANY_DOMAINS.items():
-            if known_domain in domain:
-                return company
-        
-        # Try to extract from URL patterns
-        url_patterns = [
-            # LinkedIn company pages - most reliable
-            (r'linkedin\.com/company/([^/]+)/?(?:jobs|about)?$', 'linkedin'),
-            # Indeed company pages  
-            (r'indeed\.(?:com|co\.uk)/cmp/([^/]+)', 'indeed'),
-            # Glassdoor company pages
-            (r'glassdoor\.(?:com|co\.uk)/Overview/Working-at-([^-]+)-', 'glassdoor'),
-            # Reed
-            (r'reed\.co\.uk/company/([^/]+)', 'reed'),
-            # Totaljobs
-            (r'totaljobs\.com/company/([^/]+)', 'totaljobs'),
-        ]
+        company = self._known_company(parsed_url.hostname or '')
+        if company:
+            return company
         
-        for pattern, source in url_patterns:
-            match = re.search(pattern, url_lower)
-            if match:
-                extracted = match.group(1).replace('-', ' ').title()
-                cleaned = self._clean_company_name(extracted)
-                if cleaned:
-                    return cleaned
+        # Try to extract from the job board's URL pattern
+        for board, pattern in _URL_PATTERNS.items():
+            if board in domain:
+                match = pattern.search(url_lower)
+                if match:
+                    extracted = match.group(1).replace('-', ' ').title()
+                    cleaned = self._clean_company_name(extracted)
+                    if cleaned:
+                        return cleaned
+                break
         
         # Subdomain extraction (careers.company.com)
-        subdomain_match = re.match(r'^([^.]+)\.(?:careers?|jobs|apply|workday)\.', domain)
+        subdomain_match = _SUBDOMAIN_RE.match(domain)
         if subdomain_match:
             company = subdomain_match.group(1).title()
             cleaned = self._clean_company_name(company)
             if cleaned:
                 return cleaned
         
-        # For job view pages without company in URL, don't guess
-        # This prevents false matches that hurt user trust
-        unreliable_patterns = [
-            'indeed.com/viewjob',
-            'indeed.co.uk/viewjob', 
-            'linkedin.com/jobs/view',
-            'glassdoor.com/job',
-            'reed.co.uk/jobs/',
-        ]
+        # Job view pages (e.g. indeed.com/viewjob, linkedin.com/jobs/view)
+        # don't contain the company name - would need scraping. Don't guess:
+        # false matches hurt user trust
+        return None
+    
+    def companies_from_urls(self, urls: List[str], fetch_pages: bool = False,
+                            concurrency: int = 8) -> List[Optional[str]]:
+        """Extract company names for a batch of job posting URLs.
         
-        for pattern in unreliable_patterns:
-            if pattern in url_lower:
-                # These URLs don't contain company name - would need scraping
-                return None
+        By default only the URLs themselves are used. With ``fetch_pages``,
+        URLs that don't name the company are fetched concurrently and the
+        company taken from the page's structured company markup, never a
+        guess from its title; requests to the same host are spaced at least
+        200ms apart so a batch doesn't hammer one job board.
+        """
+        companies = [self.extract_company_from_url(url) for url in urls]
+        pending = [i for i, company in enumerate(companies) if not company]
+        if not (fetch_pages and pending):
+            return companies
         
-        return None
+        limiter = _HostRateLimiter(0.2)
+        
+        def fetch(url: str) -> Optional[str]:
+            limiter.wait(urlparse(url).netloc.lower())
+            return self._fetch_page_company(url)
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for i, company in zip(pending, pool.map(fetch, [urls[i] for i in pending])):
+                companies[i] = company
+        return companies
     
     def _clean_company_name(self, name: str) -> Optional[str]:
         """Clean and validate extracted company name."""
@@ -295,11 +630,7 @@ class FastSponsorLookup:
             return None
             
         # Remove common noise words
-        noise_words = ['Jobs', 'Careers', 'Ltd', 'Limited', 'Inc', 'Corp', 'Corporation', 'PLC', 'LLC']
-        for word in noise_words:
-            name = re.sub(r'\b' + word + r'\b', '', name, flags=re.IGNORECASE)
-        
-        name = name.strip()
+        name = ' '.join(w for w in name.split() if w.lower() not in _NOISE_SET)
         
         # Validate
         if len(name) < 2:
@@ -332,11 +663,15 @@ def main():
 Examples:
   %(prog)s --company "Google UK"
   %(prog)s --url "https://www.linkedin.com/jobs/view/123"
+  %(prog)s --batch urls.txt --fetch-pages
   %(prog)s --interactive
         """
     )
     parser.add_argument('--company', '-c', help='Company name to search')
     parser.add_argument('--url', '-u', help='Job posting URL to analyze')
+    parser.add_argument('--batch', '-b', metavar='FILE', help='File of job posting URLs to analyze, one per line')
+    parser.add_argument('--fetch-pages', action='store_true',
+                        help="With --url/--batch, fetch pages whose URL doesn't name the company")
     parser.add_argument('--interactive', '-i', action='store_true', help='Interactive mode')
     parser.add_argument('--csv', default='uk_sponsors.csv', help='Path to sponsor CSV file')
     parser.add_argument('--threshold', '-t', type=float, default=0.5, help='Match threshold (0-1)')
@@ -376,6 +711,9 @@ Examples:
     elif args.url:
         print(f"\nAnalyzing URL: {args.url}\n")
         company = lookup.extract_company_from_url(args.url)
+        if not company and args.fetch_pages:
+            # Same opt-in fallback as --batch: the page's company markup
+            company = lookup.companies_from_urls([args.url], fetch_pages=True)[0]
         
         if not company:
             print("Could not extract company name from URL")
@@ -403,6 +741,32 @@ Examples:
             print("❌ NOT FOUND: Not a registered sponsor")
         print("-" * 50)
     
+    elif args.batch:
+        try:
+            with open(args.batch, encoding='utf-8') as f:
+                urls = [line.strip() for line in f if line.strip()]
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        
+        print(f"\nAnalyzing {len(urls)} URLs from {args.batch}\n")
+        companies = lookup.companies_from_urls(urls, fetch_pages=args.fetch_pages)
+        
+        for url, company in zip(urls, companies):
+            print(url)
+            if not company:
+                print("   Could not extract company name from URL\n")
+                continue
+            
+            print(f"   Detected company: '{company}'")
+            results = lookup.search(company, threshold=args.threshold)
+            if results and results[0][1] >= 0.8:
+                print(f"   ✅ CONFIRMED: {results[0][0]['name']} (Match: {results[0][1]:.0%})\n")
+            elif results and results[0][1] >= 0.5:
+                print(f"   ⚠️  POSSIBLE MATCH: {results[0][0]['name']} (Match: {results[0][1]:.0%})\n")
+            else:
+                print("   ❌ NOT FOUND: Not a registered sponsor\n")
+    
     elif args.interactive:
         print("\n" + "=" * 50)
         print("   UK SPONSOR LOOKUP - Interactive Mode")